@@ -4,21 +4,132 @@ Core Chemical Engineering Bot Engine
 Integrates Gemini API with web search and chemical engineering expertise
 """
 
-import google.generativeai as genai
-import streamlit as st
+# Streamlit is optional so the engine stays importable outside the app
+try:
+    import streamlit as st
+except ModuleNotFoundError:
+    st = None
+
+import numpy as np
 from typing import Optional, Dict, Any, List
+from collections import Counter, deque
 import time
 import re
 
-from .prompts import get_chemE_prompt, SAFETY_KEYWORDS, CHEME_TERMS
+# Prefer google-re2's linear-time engine for hot patterns when available
+try:
+    import re2 as _regex
+except ImportError:
+    _regex = re
+
+# Prefer an Aho-Corasick automaton for multi-keyword scans when available
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+from .prompts import get_chemE_messages, SAFETY_KEYWORDS, CHEME_TERMS
 from .utils import (
-    clean_text, 
-    categorize_question, 
+    clean_text,
+    categorize_question,
     validate_input,
     format_response_for_display,
     log_interaction
 )
 from .search_engine import search_engine
+from .response_cache import response_cache
+from .semantic_cache import SemanticCache, semantic_cache
+
+# Precompiled patterns, built once at import
+_WHITESPACE_RE = re.compile(r'\s+')
+_SOURCE_RE = _regex.compile(r'From ([^:]+):')
+
+# Single alternation per keyword set: one linear scan instead of one
+# substring probe per keyword
+_SAFETY_RE = _regex.compile('|'.join(re.escape(k) for k in SAFETY_KEYWORDS))
+_CHEME_RE = _regex.compile('|'.join(re.escape(t) for t in CHEME_TERMS))
+
+# Topic-based suggestions for suggest_related_topics
+_TOPIC_SUGGESTIONS = {
+    'distillation': ['McCabe-Thiele method', 'Raoult\'s law', 'VLE diagrams', 'Packed columns'],
+    'reactor': ['CSTR design', 'PFR design', 'Reaction kinetics', 'Reactor sizing'],
+    'heat exchanger': ['LMTD method', 'Heat transfer coefficients', 'Shell and tube design'],
+    'safety': ['HAZOP analysis', 'Risk assessment', 'Safety systems', 'Emergency procedures'],
+    'thermodynamics': ['Phase equilibria', 'Gibbs free energy', 'Enthalpy calculations']
+}
+
+def _build_automaton(words, payloads=None):
+    """
+    Build an Aho-Corasick automaton over lowercased words, or None
+
+    Args:
+        words: Iterable of keywords to match
+        payloads: Optional mapping from keyword to the value emitted on a
+            match; the keyword itself is emitted when omitted
+    """
+    if ahocorasick is None:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        value = payloads[word] if payloads is not None else word
+        automaton.add_word(word.lower(), value)
+    automaton.make_automaton()
+    return automaton
+
+# Automata built once at import: each scan is a single state-machine pass.
+# The topic automaton carries each topic's suggestion list as its payload,
+# so matches need no second dictionary lookup.
+_SAFETY_AC = _build_automaton(SAFETY_KEYWORDS)
+_CHEME_AC = _build_automaton(CHEME_TERMS)
+_TOPIC_AC = _build_automaton(
+    _TOPIC_SUGGESTIONS,
+    payloads={topic: (topic, related) for topic, related in _TOPIC_SUGGESTIONS.items()}
+)
+
+# Fallback texts emitted when generation fails; answers starting with
+# one of these must never be cached, or a transient Gemini error would
+# be replayed from cache after the service recovers
+_GENERATION_FAILURE_PREFIXES = (
+    "Sorry, the AI system is not properly initialized",
+    "I encountered an error while generating the response:",
+    "I apologize, but I couldn't generate a response",
+)
+
+def _is_generation_failure(text: str) -> bool:
+    """Check whether a generated answer is one of the failure fallbacks"""
+    return text.startswith(_GENERATION_FAILURE_PREFIXES)
+
+# Safety settings applied to every Gemini generation call
+_SAFETY_SETTINGS = [
+    {
+        "category": "HARM_CATEGORY_HARASSMENT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_HATE_SPEECH",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    }
+]
+
+def _cached_context(normalized_query: str) -> str:
+    """Fetch web context through Streamlit's process-global data cache"""
+    return search_engine.get_relevant_context(normalized_query)
+
+if st is not None:
+    _cached_context = st.cache_data(ttl=3600, max_entries=512, show_spinner=False)(_cached_context)
+
+def _get_web_context(question: str) -> str:
+    """Normalize the question so equivalent phrasings share a cache entry"""
+    return _cached_context(_WHITESPACE_RE.sub(' ', question.lower()).strip())
 
 class ChemEBot:
     """Main Chemical Engineering Bot Class"""
@@ -30,15 +141,41 @@ class ChemEBot:
         Args:
             api_key (str): Gemini API key
         """
+        # Per-session state is set up before the fallible Gemini setup so
+        # ask()/ask_stream() still work (and can record turns) on a bot
+        # whose initialization failed.
+        # Ring buffer of past turns, with a parallel buffer of their
+        # question embeddings for semantic recall
+        self.conversation_history = deque(maxlen=100)
+        self._turn_embeddings = deque(maxlen=100)
+
+        # Process-global: cached answers are shared across sessions,
+        # while the conversation history above is per-bot
+        self.semantic_cache = semantic_cache
+        self.last_response = None
+
+        # Running statistics, updated incrementally in ask()/ask_stream()
+        self._type_counts = Counter()
+        self._timestamps = deque()
+
+        self.is_initialized = False
+
         try:
+            # Imported lazily so the Gemini SDK is only loaded when a bot
+            # is actually constructed, not on every script rerun
+            import google.generativeai as genai
+
             genai.configure(api_key=api_key)
+            self._genai = genai
             self.model = genai.GenerativeModel('gemini-pro')
-            self.conversation_history = []
+
             self.is_initialized = True
-            
+
         except Exception as e:
-            st.error(f"Failed to initialize Gemini API: {e}")
-            self.is_initialized = False
+            if st is not None:
+                st.error(f"Failed to initialize Gemini API: {e}")
+            else:
+                print(f"Failed to initialize Gemini API: {e}")
 
     def ask(self, question: str, include_web_search: bool = True) -> Dict[str, Any]:
         """
@@ -54,34 +191,72 @@ class ChemEBot:
         # Validate input
         is_valid, error_message = validate_input(question)
         if not is_valid:
+            self._record_turn(question, error_message, 'error', (), 0, False)
             return {
                 'answer': error_message,
                 'sources': [],
                 'question_type': 'error',
                 'processing_time': 0
             }
-        
+
         start_time = time.time()
-        
+
         try:
+            # Lowercase once; every classification step reuses this copy
+            question_lower = question.lower()
+
             # Categorize question type
-            question_type = categorize_question(question)
-            
+            question_type = categorize_question(question, question_lower)
+
+            # Check the semantic cache before any network work
+            cache_key = SemanticCache.make_key(question)
+            question_embedding = self._embed_question(question)
+            cached = self.semantic_cache.get(cache_key, question_embedding, question_type)
+
+            if cached is not None:
+                processing_time = time.time() - start_time
+                self._record_turn(
+                    question, cached['answer'], cached['question_type'],
+                    cached['sources'], processing_time,
+                    cached.get('web_context_used', False), question_embedding
+                )
+                return {
+                    'answer': cached['answer'],
+                    'sources': cached['sources'],
+                    'question_type': cached['question_type'],
+                    'processing_time': processing_time,
+                    'web_context_used': cached.get('web_context_used', False),
+                    'cached': True
+                }
+
             # Get web search context if enabled
             web_context = ""
             sources = []
-            
+
             if include_web_search:
-                web_context = search_engine.get_relevant_context(question)
+                web_context = _get_web_context(question)
                 if web_context:
                     # Extract sources from context (simplified)
                     sources = self._extract_sources_from_context(web_context)
             
-            # Generate AI response
-            ai_response = self._generate_ai_response(
-                question=question,
-                question_type=question_type,
-                web_context=web_context
+            # Recall only the past turns relevant to this question
+            history_context = self._format_history_context(
+                self._recall_similar_turns(question_embedding)
+            )
+
+            # Generate AI response; exact repeats with the same context
+            # are served from the response cache without a model call.
+            # Failure fallbacks pass through uncached so a retry after a
+            # transient error reaches the model again
+            ai_response = response_cache.get_or_call(
+                question, question_type, web_context,
+                lambda: self._generate_ai_response(
+                    question=question,
+                    question_type=question_type,
+                    web_context=web_context,
+                    history_context=history_context
+                ),
+                should_cache=lambda text: not _is_generation_failure(text)
             )
             
             # Format response for display
@@ -92,81 +267,301 @@ class ChemEBot:
             
             # Log interaction
             log_interaction(question, ai_response, sources)
-            
+
+            # Cache the answer for semantically similar follow-ups, but
+            # never a failure fallback
+            if question_embedding is not None and not _is_generation_failure(ai_response):
+                self.semantic_cache.put(cache_key, question_embedding, {
+                    'answer': formatted_response,
+                    'sources': sources,
+                    'question_type': question_type,
+                    'web_context_used': bool(web_context)
+                }, question_type)
+
             # Store in conversation history
-            self.conversation_history.append({
-                'question': question,
+            self._record_turn(
+                question, formatted_response, question_type, sources,
+                processing_time, bool(web_context), question_embedding
+            )
+
+            return {
                 'answer': formatted_response,
-                'question_type': question_type,
                 'sources': sources,
-                'timestamp': time.time()
-            })
-            
+                'question_type': question_type,
+                'processing_time': processing_time,
+                'web_context_used': bool(web_context)
+            }
+
+        except Exception as e:
+            error_response = f"I apologize, but I encountered an error while processing your question: {str(e)}"
+
+            self._record_turn(question, error_response, 'error', (),
+                              time.time() - start_time, False)
+
             return {
+                'answer': error_response,
+                'sources': [],
+                'question_type': 'error',
+                'processing_time': time.time() - start_time,
+                'error': str(e)
+            }
+
+    def ask_stream(self, question: str, include_web_search: bool = True):
+        """
+        Process a question, yielding answer text chunks as they arrive
+
+        Mirrors ask() but streams the Gemini response so the UI can render
+        text incrementally. Once the stream is exhausted, the full response
+        dict (same shape as ask() returns) is available on self.last_response.
+
+        Args:
+            question (str): User's question
+            include_web_search (bool): Whether to include web search context
+
+        Yields:
+            str: Chunks of the answer text
+        """
+        self.last_response = None
+
+        # Validate input
+        is_valid, error_message = validate_input(question)
+        if not is_valid:
+            self._record_turn(question, error_message, 'error', (), 0, False)
+            self.last_response = {
+                'answer': error_message,
+                'sources': [],
+                'question_type': 'error',
+                'processing_time': 0
+            }
+            yield error_message
+            return
+
+        start_time = time.time()
+
+        try:
+            # Lowercase once; every classification step reuses this copy
+            question_lower = question.lower()
+
+            # Categorize question type
+            question_type = categorize_question(question, question_lower)
+
+            # Check the semantic cache before any network work
+            cache_key = SemanticCache.make_key(question)
+            question_embedding = self._embed_question(question)
+            cached = self.semantic_cache.get(cache_key, question_embedding, question_type)
+
+            if cached is not None:
+                processing_time = time.time() - start_time
+                self._record_turn(
+                    question, cached['answer'], cached['question_type'],
+                    cached['sources'], processing_time,
+                    cached.get('web_context_used', False), question_embedding
+                )
+                self.last_response = {
+                    'answer': cached['answer'],
+                    'sources': cached['sources'],
+                    'question_type': cached['question_type'],
+                    'processing_time': processing_time,
+                    'web_context_used': cached.get('web_context_used', False),
+                    'cached': True
+                }
+                yield cached['answer']
+                return
+
+            # Get web search context if enabled
+            web_context = ""
+            sources = []
+
+            if include_web_search:
+                web_context = _get_web_context(question)
+                if web_context:
+                    sources = self._extract_sources_from_context(web_context)
+
+            # Recall only the past turns relevant to this question
+            history_context = self._format_history_context(
+                self._recall_similar_turns(question_embedding)
+            )
+
+            # Exact repeats with the same context skip the model call;
+            # otherwise stream the response, accumulating chunks for history
+            response_key = response_cache.make_key(question, question_type, web_context)
+            ai_response = response_cache.get(response_key)
+
+            if ai_response is not None:
+                yield ai_response
+            else:
+                chunks = []
+                for chunk_text in self._generate_ai_response_stream(
+                    question=question,
+                    question_type=question_type,
+                    web_context=web_context,
+                    history_context=history_context
+                ):
+                    chunks.append(chunk_text)
+                    yield chunk_text
+
+                ai_response = ''.join(chunks)
+                # Failure fallbacks stay uncached so a retry after a
+                # transient error reaches the model again
+                if not _is_generation_failure(ai_response):
+                    response_cache.put(response_key, ai_response)
+
+            # Format response for display
+            formatted_response = format_response_for_display(ai_response)
+
+            # Calculate processing time
+            processing_time = time.time() - start_time
+
+            # Log interaction
+            log_interaction(question, ai_response, sources)
+
+            # Cache the answer for semantically similar follow-ups, but
+            # never a failure fallback
+            if question_embedding is not None and not _is_generation_failure(ai_response):
+                self.semantic_cache.put(cache_key, question_embedding, {
+                    'answer': formatted_response,
+                    'sources': sources,
+                    'question_type': question_type,
+                    'web_context_used': bool(web_context)
+                }, question_type)
+
+            # Store in conversation history
+            self._record_turn(
+                question, formatted_response, question_type, sources,
+                processing_time, bool(web_context), question_embedding
+            )
+
+            self.last_response = {
                 'answer': formatted_response,
                 'sources': sources,
                 'question_type': question_type,
                 'processing_time': processing_time,
                 'web_context_used': bool(web_context)
             }
-            
+
         except Exception as e:
             error_response = f"I apologize, but I encountered an error while processing your question: {str(e)}"
-            
-            return {
+
+            self._record_turn(question, error_response, 'error', (),
+                              time.time() - start_time, False)
+
+            self.last_response = {
                 'answer': error_response,
                 'sources': [],
                 'question_type': 'error',
                 'processing_time': time.time() - start_time,
                 'error': str(e)
             }
+            yield error_response
+
+    def _generate_ai_response_stream(self, question: str, question_type: str, web_context: str = "",
+                                     history_context: str = ""):
+        """
+        Generate AI response chunks using Gemini's streaming API
+
+        Args:
+            question (str): User's question
+            question_type (str): Categorized question type
+            web_context (str): Context from web search
+            history_context (str): Relevant earlier turns from the conversation
+
+        Yields:
+            str: Chunks of AI-generated text
+        """
+        if not self.is_initialized:
+            yield "Sorry, the AI system is not properly initialized. Please check the API configuration."
+            return
+
+        try:
+            # Layered prompt: the stable skeleton part stays byte-identical
+            # across calls, so provider-side prefix caches can hit
+            prompt_layers = get_chemE_messages(
+                question=question,
+                question_type=question_type,
+                search_context=web_context,
+                history_context=history_context
+            )
+
+            # Generate response with safety settings, streaming chunks
+            response = self.model.generate_content(
+                prompt_layers,
+                stream=True,
+                safety_settings=_SAFETY_SETTINGS
+            )
+
+            produced = False
+            for chunk in response:
+                if chunk.text:
+                    produced = True
+                    yield chunk.text
+
+            if not produced:
+                yield "I apologize, but I couldn't generate a response to your question. Please try rephrasing it or asking a different question."
+
+        except Exception as e:
+            yield f"I encountered an error while generating the response: {str(e)}. Please try again."
+
+    def _embed_question(self, question: str) -> Optional[np.ndarray]:
+        """
+        Embed a question with Gemini's embedding endpoint
+
+        Args:
+            question (str): User's question
+
+        Returns:
+            np.ndarray: Unit-normalized embedding, or None if embedding fails
+        """
+        try:
+            result = self._genai.embed_content(
+                model='models/embedding-001',
+                content=question,
+                task_type='semantic_similarity'
+            )
+            embedding = np.asarray(result['embedding'], dtype=np.float32)
+            norm = np.linalg.norm(embedding)
+
+            if norm == 0:
+                return None
+
+            return embedding / norm
 
-    def _generate_ai_response(self, question: str, question_type: str, web_context: str = "") -> str:
+        except Exception:
+            # Embedding is an optimization; fall back to uncached behavior
+            return None
+
+    def _generate_ai_response(self, question: str, question_type: str, web_context: str = "",
+                              history_context: str = "") -> str:
         """
         Generate AI response using Gemini API
-        
+
         Args:
             question (str): User's question
             question_type (str): Categorized question type
             web_context (str): Context from web search
-            
+            history_context (str): Relevant earlier turns from the conversation
+
         Returns:
             str: AI-generated response
         """
         if not self.is_initialized:
             return "Sorry, the AI system is not properly initialized. Please check the API configuration."
-        
+
         try:
-            # Create specialized prompt
-            prompt = get_chemE_prompt(
+            # Layered prompt: the stable skeleton part stays byte-identical
+            # across calls, so provider-side prefix caches can hit
+            prompt_layers = get_chemE_messages(
                 question=question,
                 question_type=question_type,
-                search_context=web_context
+                search_context=web_context,
+                history_context=history_context
             )
-            
+
             # Generate response with safety settings
             response = self.model.generate_content(
-                prompt,
-                safety_settings=[
-                    {
-                        "category": "HARM_CATEGORY_HARASSMENT",
-                        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-                    },
-                    {
-                        "category": "HARM_CATEGORY_HATE_SPEECH",
-                        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-                    },
-                    {
-                        "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-                    },
-                    {
-                        "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-                    }
-                ]
+                prompt_layers,
+                safety_settings=_SAFETY_SETTINGS
             )
-            
+
             if response.text:
                 return response.text
             else:
@@ -177,73 +572,158 @@ class ChemEBot:
 
     def _extract_sources_from_context(self, web_context: str) -> List[str]:
         """Extract source information from web context"""
-        sources = []
-        
         # Simple extraction based on "From [source]:" pattern
-        source_pattern = r'From ([^:]+):'
-        matches = re.findall(source_pattern, web_context)
-        
-        for match in matches:
-            sources.append(match.strip())
-        
-        return list(set(sources))  # Remove duplicates
+        matches = _SOURCE_RE.findall(web_context)
+
+        # Remove duplicates while preserving order
+        return list(dict.fromkeys(match.strip() for match in matches))
+
+    def _record_turn(self, question: str, answer: str, question_type: str,
+                     sources, processing_time: float, web_context_used: bool,
+                     question_embedding: Optional[np.ndarray] = None):
+        """
+        Record a completed turn in the bounded history and statistics
+
+        This is the single store the UI renders from; turns carry the
+        metadata the chat view displays. Sources are frozen into a tuple
+        and timestamps kept as plain floats to keep entries lightweight.
+        """
+        now = time.time()
+
+        self.conversation_history.append({
+            'question': question,
+            'answer': answer,
+            'question_type': question_type,
+            'sources': tuple(sources),
+            'processing_time': processing_time,
+            'web_context_used': web_context_used,
+            'timestamp': now
+        })
+        self._turn_embeddings.append(question_embedding)
+
+        # Update running statistics
+        self._type_counts[question_type] += 1
+        self._timestamps.append(now)
+
+    def _recall_similar_turns(self, question_embedding: Optional[np.ndarray],
+                              top_k: int = 3) -> List[Dict[str, Any]]:
+        """
+        Retrieve the past turns most similar to the current question
+
+        Args:
+            question_embedding (np.ndarray): Unit-normalized question embedding
+            top_k (int): Maximum number of turns to retrieve
+
+        Returns:
+            List[Dict]: Most similar past turns, best match first
+        """
+        if question_embedding is None:
+            return []
+
+        # Turns whose questions could not be embedded are skipped
+        indexed = [
+            (index, embedding)
+            for index, embedding in enumerate(self._turn_embeddings)
+            if embedding is not None
+        ]
+
+        if not indexed:
+            return []
+
+        matrix = np.stack([embedding for _, embedding in indexed])
+        similarities = matrix @ question_embedding
+
+        turns = []
+        for rank in np.argsort(similarities)[::-1][:top_k]:
+            if similarities[rank] <= 0:
+                break
+            turns.append(self.conversation_history[indexed[int(rank)][0]])
+
+        return turns
+
+    def _format_history_context(self, turns: List[Dict[str, Any]]) -> str:
+        """Format recalled turns as compact Q/A pairs for the prompt"""
+        parts = []
+
+        for turn in turns:
+            answer = turn['answer']
+            if len(answer) > 300:
+                answer = answer[:300] + "..."
+            parts.append(f"Q: {turn['question']}\nA: {answer}")
+
+        return "\n\n".join(parts)
 
     def get_conversation_history(self) -> List[Dict[str, Any]]:
         """Get conversation history"""
-        return self.conversation_history
+        return list(self.conversation_history)
 
     def clear_history(self):
-        """Clear conversation history"""
-        self.conversation_history = []
+        """Clear this session's conversation history and statistics
+
+        The shared caches (search context, response, semantic) are left
+        alone: they are process-global and serve other sessions too.
+        """
+        self.conversation_history.clear()
+        self._turn_embeddings.clear()
+        self._type_counts.clear()
+        self._timestamps.clear()
 
     def get_statistics(self) -> Dict[str, Any]:
-        """Get bot usage statistics"""
+        """Get bot usage statistics from the running counters"""
         if not self.conversation_history:
             return {
                 'total_questions': 0,
                 'question_types': {},
                 'average_response_time': 0
             }
-        
-        question_types = {}
-        total_time = 0
-        
-        for conv in self.conversation_history:
-            q_type = conv.get('question_type', 'unknown')
-            question_types[q_type] = question_types.get(q_type, 0) + 1
-        
+
+        # Expire timestamps older than an hour from the left of the deque
+        now = time.time()
+        while self._timestamps and now - self._timestamps[0] > 3600:
+            self._timestamps.popleft()
+
         return {
             'total_questions': len(self.conversation_history),
-            'question_types': question_types,
-            'recent_questions': len([c for c in self.conversation_history if time.time() - c.get('timestamp', 0) < 3600])
+            'question_types': dict(self._type_counts),
+            'recent_questions': len(self._timestamps)
         }
 
-    def is_safety_related(self, question: str) -> bool:
+    def is_safety_related(self, question: str, question_lower: Optional[str] = None) -> bool:
         """Check if question is safety-related"""
-        question_lower = question.lower()
-        return any(keyword in question_lower for keyword in SAFETY_KEYWORDS)
+        if question_lower is None:
+            question_lower = question.lower()
+
+        if _SAFETY_AC is not None:
+            return next(_SAFETY_AC.iter(question_lower), None) is not None
 
-    def is_cheme_related(self, question: str) -> bool:
+        return _SAFETY_RE.search(question_lower) is not None
+
+    def is_cheme_related(self, question: str, question_lower: Optional[str] = None) -> bool:
         """Check if question is chemical engineering related"""
-        question_lower = question.lower()
-        return any(term in question_lower for term in CHEME_TERMS)
+        if question_lower is None:
+            question_lower = question.lower()
+
+        if _CHEME_AC is not None:
+            return next(_CHEME_AC.iter(question_lower), None) is not None
+
+        return _CHEME_RE.search(question_lower) is not None
 
-    def suggest_related_topics(self, question: str) -> List[str]:
+    def suggest_related_topics(self, question: str, question_lower: Optional[str] = None) -> List[str]:
         """Suggest related topics based on the question"""
         suggestions = []
-        question_lower = question.lower()
-        
-        # Topic-based suggestions
-        topic_suggestions = {
-            'distillation': ['McCabe-Thiele method', 'Raoult\'s law', 'VLE diagrams', 'Packed columns'],
-            'reactor': ['CSTR design', 'PFR design', 'Reaction kinetics', 'Reactor sizing'],
-            'heat exchanger': ['LMTD method', 'Heat transfer coefficients', 'Shell and tube design'],
-            'safety': ['HAZOP analysis', 'Risk assessment', 'Safety systems', 'Emergency procedures'],
-            'thermodynamics': ['Phase equilibria', 'Gibbs free energy', 'Enthalpy calculations']
-        }
-        
-        for topic, related in topic_suggestions.items():
-            if topic in question_lower:
-                suggestions.extend(related[:2])  # Add top 2 suggestions
-        
+        if question_lower is None:
+            question_lower = question.lower()
+
+        # One automaton pass emits each matched topic's suggestions directly
+        if _TOPIC_AC is not None:
+            seen = set()
+            for _, (topic, related) in _TOPIC_AC.iter(question_lower):
+                if topic not in seen:
+                    seen.add(topic)
+                    suggestions.extend(related[:2])  # Add top 2 suggestions
+        else:
+            for topic, related in _TOPIC_SUGGESTIONS.items():
+                if topic in question_lower:
+                    suggestions.extend(related[:2])  # Add top 2 suggestions
+
         return suggestions[:3]  # Return max 3 suggestions
\ No newline at end of file
@@ -4,36 +4,128 @@ Web Search Engine for Chemical Engineering Content
 """
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
+import aiohttp
+import asyncio
+
+# Prefer selectolax's C-backed HTML parser when available
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# Prefer an Aho-Corasick automaton for topic lookups when available
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 import time
-from typing import List, Dict, Any
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from typing import List, Dict, Any, Optional
 from urllib.parse import quote_plus, urljoin
 import re
 from .utils import clean_text, get_source_priority_score
 
+# Precompiled pattern for normalizing cache keys
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Shared worker pool for parallel page fetches
+_POOL = ThreadPoolExecutor(max_workers=8)
+
+# Predefined educational content for common ChemE topics, keyed by the
+# phrase that triggers it; read-only, built once at import
+_EDUCATIONAL_CONTENT = (
+    ('distillation', {
+        'title': 'Distillation - Chemical Engineering',
+        'url': 'https://en.wikipedia.org/wiki/Distillation',
+        'snippet': 'Distillation is a separation process that exploits differences in volatility of components in a liquid mixture.',
+        'source': 'Educational',
+        'priority': 7
+    }),
+    ('reactor', {
+        'title': 'Chemical Reactor Design',
+        'url': 'https://en.wikipedia.org/wiki/Chemical_reactor',
+        'snippet': 'A chemical reactor is an enclosed volume in which a chemical reaction takes place.',
+        'source': 'Educational',
+        'priority': 7
+    }),
+    ('heat exchanger', {
+        'title': 'Heat Exchanger Design',
+        'url': 'https://en.wikipedia.org/wiki/Heat_exchanger',
+        'snippet': 'A heat exchanger is a system used to transfer heat between two or more fluids.',
+        'source': 'Educational',
+        'priority': 7
+    })
+)
+
+def _build_edu_automaton():
+    """Build an automaton mapping each topic phrase to its content entry"""
+    if ahocorasick is None:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for topic, content in _EDUCATIONAL_CONTENT:
+        automaton.add_word(topic, (topic, content))
+    automaton.make_automaton()
+    return automaton
+
+_EDU_AC = _build_edu_automaton()
+
 class ChemESearchEngine:
     """Chemical Engineering focused web search engine"""
-    
+
+    # Preferred domains for chemical engineering content; class-level and
+    # frozen so membership tests are O(1) and never rebuilt per instance
+    PREFERRED_DOMAINS: frozenset = frozenset({
+        'en.wikipedia.org',
+        'aiche.org',
+        'nist.gov',
+        'epa.gov',
+        'osha.gov',
+        'engineeringtoolbox.com',
+        'chemguide.co.uk',
+        'khanacademy.org'
+    })
+
+    # Search tuning, shared by all instances
+    MAX_RESULTS = 5
+    TIMEOUT = 10
+
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            # Only encodings the installed stack can decode; advertising
+            # br without a brotli decoder breaks both fetch paths
+            'Accept-Encoding': 'gzip, deflate'
         })
+
+        # Widen the connection pool so parallel fetches reuse keep-alive
+        # connections instead of queueing on the default per-host cap, and
+        # retry transient failures with a short backoff
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.2,
+                status_forcelist=[429, 500, 502, 503, 504]
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         
-        # Preferred domains for chemical engineering content
-        self.preferred_domains = [
-            'en.wikipedia.org',
-            'aiche.org',
-            'nist.gov',
-            'epa.gov',
-            'osha.gov',
-            'engineeringtoolbox.com',
-            'chemguide.co.uk',
-            'khanacademy.org'
-        ]
-        
-        self.max_results = 5
-        self.timeout = 10
+        # TTL + LRU cache for search context (normalized query -> context)
+        self._context_cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_maxsize = 512
+        self._cache_ttl = 3600  # seconds
+        self._cache_hits = 0
+        self._cache_misses = 0
 
     def search_web(self, query: str) -> List[Dict[str, Any]]:
         """
@@ -67,118 +159,159 @@ class ChemESearchEngine:
             List[Dict]: Search results
         """
         results = []
-        
+
         try:
-            # Search multiple sources
-            sources = [
-                self._search_wikipedia(query),
-                self._search_educational_sites(query)
-            ]
-            
+            # Search Wikipedia and educational sites concurrently
+            sources = self._run_async(self._gather_search_results(query))
+
             # Combine and deduplicate results
             for source_results in sources:
+                if isinstance(source_results, Exception):
+                    continue
                 results.extend(source_results)
-            
+
             # Remove duplicates and sort by relevance
             unique_results = self._deduplicate_results(results)
-            return unique_results[:self.max_results]
-            
+            return unique_results[:self.MAX_RESULTS]
+
         except Exception as e:
             print(f"Scraping error: {e}")
             return []
 
+    def _run_async(self, coro):
+        """
+        Run a coroutine from synchronous code
+
+        Args:
+            coro: Coroutine to run
+
+        Returns:
+            Result of the coroutine
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+
+        # A loop is already running in this thread and cannot be nested;
+        # run the coroutine on a worker thread with its own fresh loop
+        return _POOL.submit(asyncio.run, coro).result()
+
+    async def _gather_search_results(self, query: str) -> List[Any]:
+        """Run all search sources concurrently and collect their results"""
+        return await asyncio.gather(
+            self._search_wikipedia_async(query),
+            asyncio.to_thread(self._search_educational_sites, query),
+            return_exceptions=True
+        )
+
     def _search_wikipedia(self, query: str) -> List[Dict[str, Any]]:
-        """Search Wikipedia for chemical engineering content"""
+        """Search Wikipedia for chemical engineering content (sync wrapper)"""
+        return self._run_async(self._search_wikipedia_async(query))
+
+    async def _search_wikipedia_async(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Search Wikipedia for chemical engineering content
+
+        Probes all candidate page titles concurrently and keeps the first
+        successful response, so latency is the slowest single probe instead
+        of the sum of all probes.
+        """
         results = []
-        
+
         try:
             # Wikipedia API search
             wiki_api = "https://en.wikipedia.org/api/rest_v1/page/summary/"
-            
+
             # Try direct page lookup first
             search_terms = [
                 query.replace(' ', '_'),
                 f"Chemical_{query.replace(' ', '_')}",
                 f"{query.replace(' ', '_')}_engineering"
             ]
-            
-            for term in search_terms[:2]:  # Limit attempts
+
+            timeout = aiohttp.ClientTimeout(total=self.TIMEOUT)
+            async with aiohttp.ClientSession(
+                timeout=timeout,
+                headers=dict(self.session.headers)
+            ) as session:
+                tasks = [
+                    asyncio.create_task(self._fetch_summary(session, f"{wiki_api}{term}"))
+                    for term in search_terms[:2]  # Limit attempts
+                ]
+
                 try:
-                    response = self.session.get(
-                        f"{wiki_api}{term}", 
-                        timeout=self.timeout
-                    )
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        
-                        results.append({
-                            'title': data.get('title', ''),
-                            'url': data.get('content_urls', {}).get('desktop', {}).get('page', ''),
-                            'snippet': data.get('extract', ''),
-                            'source': 'Wikipedia',
-                            'priority': 8
-                        })
-                        break
-                        
-                except Exception:
-                    continue
-                    
+                    # Take the first successful probe, cancel the rest
+                    for future in asyncio.as_completed(tasks):
+                        try:
+                            data = await future
+                        except Exception:
+                            continue
+
+                        if data:
+                            results.append({
+                                'title': data.get('title', ''),
+                                'url': data.get('content_urls', {}).get('desktop', {}).get('page', ''),
+                                'snippet': data.get('extract', ''),
+                                'source': 'Wikipedia',
+                                'priority': 8
+                            })
+                            break
+                finally:
+                    for task in tasks:
+                        task.cancel()
+
         except Exception as e:
             print(f"Wikipedia search error: {e}")
-            
+
         return results
 
+    async def _fetch_summary(self, session: aiohttp.ClientSession, url: str) -> Optional[Dict[str, Any]]:
+        """Fetch a Wikipedia summary JSON, returning None on non-200 responses"""
+        async with session.get(url) as response:
+            if response.status == 200:
+                return await response.json()
+            return None
+
     def _search_educational_sites(self, query: str) -> List[Dict[str, Any]]:
         """Search educational websites for content"""
         results = []
-        
-        # Predefined educational content for common ChemE topics
-        educational_content = {
-            'distillation': {
-                'title': 'Distillation - Chemical Engineering',
-                'url': 'https://en.wikipedia.org/wiki/Distillation',
-                'snippet': 'Distillation is a separation process that exploits differences in volatility of components in a liquid mixture.',
-                'source': 'Educational',
-                'priority': 7
-            },
-            'reactor': {
-                'title': 'Chemical Reactor Design',
-                'url': 'https://en.wikipedia.org/wiki/Chemical_reactor',
-                'snippet': 'A chemical reactor is an enclosed volume in which a chemical reaction takes place.',
-                'source': 'Educational', 
-                'priority': 7
-            },
-            'heat exchanger': {
-                'title': 'Heat Exchanger Design',
-                'url': 'https://en.wikipedia.org/wiki/Heat_exchanger',
-                'snippet': 'A heat exchanger is a system used to transfer heat between two or more fluids.',
-                'source': 'Educational',
-                'priority': 7
-            }
-        }
-        
-        # Check if query matches any predefined content
         query_lower = query.lower()
-        for topic, content in educational_content.items():
-            if topic in query_lower:
-                results.append(content)
-        
+
+        # Check if query matches any predefined content in a single pass
+        if _EDU_AC is not None:
+            seen = set()
+            for _, (topic, content) in _EDU_AC.iter(query_lower):
+                if topic not in seen:
+                    seen.add(topic)
+                    results.append(content)
+        else:
+            for topic, content in _EDUCATIONAL_CONTENT:
+                if topic in query_lower:
+                    results.append(content)
+
         return results
 
     def _deduplicate_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Remove duplicate results and sort by priority"""
-        seen_urls = set()
-        unique_results = []
-        
+        # One dict build dedups by URL, keeping the first occurrence and
+        # preserving insertion order
+        by_url: Dict[str, Dict[str, Any]] = {}
         for result in results:
             url = result.get('url', '')
-            if url and url not in seen_urls:
-                seen_urls.add(url)
-                unique_results.append(result)
-        
-        # Sort by priority score
-        return sorted(unique_results, key=lambda x: x.get('priority', 0), reverse=True)
+            if url:
+                by_url.setdefault(url, result)
+        unique_results = list(by_url.values())
+
+        # Sort by priority score via a single C-level argsort
+        priorities = np.fromiter(
+            (result.get('priority', 0) for result in unique_results),
+            dtype=np.int32,
+            count=len(unique_results)
+        )
+        order = np.argsort(-priorities, kind='stable')
+
+        return [unique_results[i] for i in order]
 
     def extract_content_from_url(self, url: str) -> str:
         """
@@ -191,20 +324,22 @@ class ChemESearchEngine:
             str: Extracted text content
         """
         try:
-            response = self.session.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "footer", "header"]):
-                script.decompose()
-            
-            # Get text content
-            text = soup.get_text()
-            
-            # Clean and limit text
-            cleaned_text = clean_text(text)
+            # Stream the body and stop at a byte cap: everything past the
+            # first ~64KB is discarded by the truncation below anyway
+            with self.session.get(url, timeout=self.TIMEOUT, stream=True) as response:
+                response.raise_for_status()
+
+                buffer = bytearray()
+                for chunk in response.iter_content(8192):
+                    buffer.extend(chunk)
+                    if len(buffer) >= 65536:
+                        break
+
+            text = self._extract_text_from_html(bytes(buffer))
+
+            # Clean and limit text; only the first couple of thousand raw
+            # characters can survive the 1000-char cap below
+            cleaned_text = clean_text(text[:2000])
             
             # Limit to first 1000 characters for context
             return cleaned_text[:1000] + "..." if len(cleaned_text) > 1000 else cleaned_text
@@ -213,23 +348,151 @@ class ChemESearchEngine:
             print(f"Content extraction error for {url}: {e}")
             return ""
 
+    def _extract_text_from_html(self, html: bytes) -> str:
+        """
+        Extract readable text from an HTML document
+
+        Uses selectolax's C parser when installed, falling back to
+        BeautifulSoup with the lxml backend.
+
+        Args:
+            html (bytes): Raw HTML document
+
+        Returns:
+            str: Extracted text content
+        """
+        if HTMLParser is not None:
+            tree = HTMLParser(html)
+
+            # Remove script and style elements
+            for tag in tree.css('script, style, nav, footer, header'):
+                tag.decompose()
+
+            body = tree.body
+            return body.text(separator=' ') if body is not None else ''
+
+        # Imported lazily: bs4 is only needed on this fallback path, and
+        # skipping it at module import keeps Streamlit cold starts fast
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, 'lxml')
+
+        # Remove script and style elements
+        for script in soup(["script", "style", "nav", "footer", "header"]):
+            script.decompose()
+
+        return soup.get_text()
+
+    def extract_content_batch(self, urls: List[str]) -> List[str]:
+        """
+        Extract text content from several URLs in parallel
+
+        Fetches overlap on the shared thread pool, so total latency is the
+        slowest single fetch instead of the sum of all fetches.
+
+        Args:
+            urls (List[str]): URLs to extract content from
+
+        Returns:
+            List[str]: Extracted text per URL, in input order
+        """
+        if not urls:
+            return []
+
+        contents = [""] * len(urls)
+        futures = {
+            _POOL.submit(self.extract_content_from_url, url): index
+            for index, url in enumerate(urls)
+        }
+
+        try:
+            for future in as_completed(futures, timeout=self.TIMEOUT * 2):
+                try:
+                    contents[futures[future]] = future.result()
+                except Exception as e:
+                    print(f"Batch extraction error: {e}")
+        except FutureTimeoutError:
+            # Leave unfinished slots empty rather than blocking further
+            for future in futures:
+                future.cancel()
+
+        return contents
+
+    def _normalize_query(self, query: str) -> str:
+        """Normalize a query into a stable cache key"""
+        return _WHITESPACE_RE.sub(' ', query.lower()).strip()
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        """Look up a cached context, evicting it if expired"""
+        with self._cache_lock:
+            entry = self._context_cache.get(key)
+
+            if entry is not None:
+                context, timestamp = entry
+                if time.time() - timestamp < self._cache_ttl:
+                    # Refresh LRU position
+                    self._context_cache.move_to_end(key)
+                    self._cache_hits += 1
+                    return context
+
+                # Expired entry
+                del self._context_cache[key]
+
+            self._cache_misses += 1
+            return None
+
+    def _cache_put(self, key: str, context: str):
+        """Store a context string, evicting the least recently used entry"""
+        with self._cache_lock:
+            self._context_cache[key] = (context, time.time())
+            self._context_cache.move_to_end(key)
+
+            while len(self._context_cache) > self._cache_maxsize:
+                self._context_cache.popitem(last=False)
+
+    def clear_context_cache(self):
+        """Clear the search context cache"""
+        with self._cache_lock:
+            self._context_cache.clear()
+            self._cache_hits = 0
+            self._cache_misses = 0
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss statistics for debugging"""
+        with self._cache_lock:
+            total = self._cache_hits + self._cache_misses
+            return {
+                'hits': self._cache_hits,
+                'misses': self._cache_misses,
+                'hit_rate': self._cache_hits / total if total else 0.0,
+                'entries': len(self._context_cache)
+            }
+
     def get_relevant_context(self, query: str) -> str:
         """
         Get relevant context from web search
-        
+
+        Results are cached per normalized query with a TTL, so repeated
+        questions skip the network round trip entirely.
+
         Args:
             query (str): User's question/query
-            
+
         Returns:
             str: Relevant context from web sources
         """
         try:
+            # Check cache before hitting the network
+            cache_key = self._normalize_query(query)
+            cached_context = self._cache_get(cache_key)
+            if cached_context is not None:
+                return cached_context
             # Search for relevant content
             search_results = self.search_web(query)
-            
+
             if not search_results:
                 return ""
-            
+
             # Combine snippets from top results
             context_parts = []
             for result in search_results[:3]:  # Use top 3 results
@@ -237,8 +500,14 @@ class ChemESearchEngine:
                 if snippet:
                     source = result.get('source', 'Web')
                     context_parts.append(f"From {source}: {snippet}")
-            
-            return "\n\n".join(context_parts)
+
+            context = "\n\n".join(context_parts)
+
+            # Cache successful lookups only, so transient failures retry
+            if context:
+                self._cache_put(cache_key, context)
+
+            return context
             
         except Exception as e:
             print(f"Context extraction error: {e}")
@@ -8,7 +8,6 @@ import streamlit as st
 import time
 import os
 import sys
-from datetime import datetime
 
 # Fix import path for Streamlit Cloud
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -84,10 +83,7 @@ def initialize_session_state():
     """Initialize Streamlit session state variables"""
     if 'bot' not in st.session_state:
         st.session_state.bot = None
-    
-    if 'chat_history' not in st.session_state:
-        st.session_state.chat_history = []
-    
+
     if 'api_key_valid' not in st.session_state:
         st.session_state.api_key_valid = False
     
@@ -102,13 +98,17 @@ def setup_api_key():
     try:
         # Try to get API key from Streamlit secrets
         api_key = st.secrets.get("GEMINI_API_KEY", "")
-        
+
         if not api_key:
             st.error("⚠️ Gemini API key not found in secrets. Please add GEMINI_API_KEY to your Streamlit secrets.")
             st.info("💡 For local development, add your API key to `.streamlit/secrets.toml`")
             return False
-        
-        # Initialize bot if not already done
+
+        # Initialize bot if not already done. The bot lives in session
+        # state so each browser session has its own conversation history;
+        # the expensive shared pieces (search engine, response and
+        # semantic caches, cached web context) are process-global module
+        # singletons and construction itself is just local client setup
         if st.session_state.bot is None:
             st.session_state.bot = ChemEBot(api_key)
             
@@ -152,7 +152,6 @@ def display_sidebar():
         
         # Clear chat button
         if st.button("🗑️ Clear Chat History"):
-            st.session_state.chat_history = []
             if st.session_state.bot:
                 st.session_state.bot.clear_history()
             st.rerun()
@@ -176,13 +175,14 @@ def display_sidebar():
         """, unsafe_allow_html=True)
         
         # Statistics
-        if st.session_state.bot and st.session_state.chat_history:
+        if st.session_state.bot and st.session_state.bot.get_conversation_history():
             st.header("📊 Session Stats")
+            bot_stats = st.session_state.bot.get_statistics()
             stats = {
-                'Questions Asked': len(st.session_state.chat_history),
-                'Bot Responses': len([msg for msg in st.session_state.chat_history if msg['role'] == 'assistant'])
+                'Questions Asked': bot_stats['total_questions'],
+                'Bot Responses': bot_stats['total_questions']
             }
-            
+
             for key, value in stats.items():
                 st.metric(key, value)
         
@@ -202,45 +202,38 @@ def display_sidebar():
                 st.rerun()
 
 def display_chat_history():
-    """Display chat conversation history"""
-    if not st.session_state.chat_history:
+    """Display chat conversation history straight from the bot's store"""
+    history = st.session_state.bot.get_conversation_history() if st.session_state.bot else []
+
+    if not history:
         st.info("👋 Welcome! Ask me any chemical engineering question to get started.")
         return
-    
-    for message in st.session_state.chat_history:
-        if message['role'] == 'user':
-            with st.chat_message("user"):
-                st.write(message['content'])
-        
-        elif message['role'] == 'assistant':
-            with st.chat_message("assistant"):
-                st.write(message['content'])
-                
-                # Show sources if enabled and available
-                if (st.session_state.show_sources and 
-                    'sources' in message and 
-                    message['sources']):
-                    
-                    with st.expander("📚 Sources"):
-                        for source in message['sources']:
-                            st.write(f"• {source}")
-                
-                # Show metadata
-                if 'metadata' in message:
-                    metadata = message['metadata']
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        if 'question_type' in metadata:
-                            st.caption(f"Type: {metadata['question_type'].title()}")
-                    
-                    with col2:
-                        if 'processing_time' in metadata:
-                            st.caption(f"Time: {metadata['processing_time']:.1f}s")
-                    
-                    with col3:
-                        if 'web_context_used' in metadata:
-                            st.caption(f"Web: {'✅' if metadata['web_context_used'] else '❌'}")
+
+    for turn in history:
+        with st.chat_message("user"):
+            st.write(turn['question'])
+
+        with st.chat_message("assistant"):
+            st.write(turn['answer'])
+
+            # Show sources if enabled and available
+            if st.session_state.show_sources and turn.get('sources'):
+                with st.expander("📚 Sources"):
+                    for source in turn['sources']:
+                        st.write(f"• {source}")
+
+            # Show metadata
+            col1, col2, col3 = st.columns(3)
+
+            with col1:
+                st.caption(f"Type: {turn.get('question_type', 'unknown').title()}")
+
+            with col2:
+                st.caption(f"Time: {turn.get('processing_time', 0):.1f}s")
+
+            with col3:
+                web_used = turn.get('web_context_used', False)
+                st.caption(f"Web: {'✅' if web_used else '❌'}")
 
 def handle_user_input():
     """Handle user input and generate bot response"""
@@ -253,71 +246,47 @@ def handle_user_input():
         user_question = st.chat_input("Ask me anything about chemical engineering...")
     
     if user_question:
-        # Add user message to chat history
-        st.session_state.chat_history.append({
-            'role': 'user',
-            'content': user_question,
-            'timestamp': datetime.now()
-        })
-        
         # Display user message immediately
         with st.chat_message("user"):
             st.write(user_question)
         
         # Generate bot response
         with st.chat_message("assistant"):
-            with st.spinner("🤔 Thinking..."):
-                try:
-                    # Get response from bot
-                    response_data = st.session_state.bot.ask(
+            try:
+                # Stream response chunks to the UI as they arrive
+                streamed_text = st.write_stream(
+                    st.session_state.bot.ask_stream(
                         question=user_question,
                         include_web_search=st.session_state.web_search_enabled
                     )
+                )
+
+                # The bot records the turn itself; only metadata is needed here
+                response_data = st.session_state.bot.last_response or {
+                    'answer': streamed_text
+                }
+
+                # Show sources if enabled
+                if (st.session_state.show_sources and 
+                    response_data.get('sources')):
                     
-                    # Display response
-                    st.write(response_data['answer'])
-                    
-                    # Add to chat history
-                    st.session_state.chat_history.append({
-                        'role': 'assistant',
-                        'content': response_data['answer'],
-                        'sources': response_data.get('sources', []),
-                        'metadata': {
-                            'question_type': response_data.get('question_type', 'unknown'),
-                            'processing_time': response_data.get('processing_time', 0),
-                            'web_context_used': response_data.get('web_context_used', False)
-                        },
-                        'timestamp': datetime.now()
-                    })
-                    
-                    # Show sources if enabled
-                    if (st.session_state.show_sources and 
-                        response_data.get('sources')):
-                        
-                        with st.expander("📚 Sources"):
-                            for source in response_data['sources']:
-                                st.write(f"• {source}")
-                    
-                    # Show processing info
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.caption(f"Type: {response_data.get('question_type', 'unknown').title()}")
-                    with col2:
-                        st.caption(f"Time: {response_data.get('processing_time', 0):.1f}s")
-                    with col3:
-                        web_used = response_data.get('web_context_used', False)
-                        st.caption(f"Web: {'✅' if web_used else '❌'}")
+                    with st.expander("📚 Sources"):
+                        for source in response_data['sources']:
+                            st.write(f"• {source}")
                 
-                except Exception as e:
-                    error_msg = f"❌ Sorry, I encountered an error: {str(e)}"
-                    st.error(error_msg)
-                    
-                    # Add error to chat history
-                    st.session_state.chat_history.append({
-                        'role': 'assistant',
-                        'content': error_msg,
-                        'timestamp': datetime.now()
-                    })
+                # Show processing info
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.caption(f"Type: {response_data.get('question_type', 'unknown').title()}")
+                with col2:
+                    st.caption(f"Time: {response_data.get('processing_time', 0):.1f}s")
+                with col3:
+                    web_used = response_data.get('web_context_used', False)
+                    st.caption(f"Web: {'✅' if web_used else '❌'}")
+            
+            except Exception as e:
+                error_msg = f"❌ Sorry, I encountered an error: {str(e)}"
+                st.error(error_msg)
 
 def main():
     """Main application function"""
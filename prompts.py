@@ -88,48 +88,151 @@ Structure your response as follows:
 - Further reading suggestions
 """
 
-def get_chemE_prompt(question, question_type="general", search_context=""):
+def _canon(text):
+    """
+    Canonicalize prompt text to stable bytes
+
+    Strips trailing whitespace per line and leading/trailing blank lines,
+    and normalizes line endings, so casual edits to the triple-quoted
+    sources cannot change the emitted bytes and silently break
+    provider-side prefix caching.
+    """
+    return "\n".join(line.rstrip() for line in text.strip().splitlines()) + "\n"
+
+# Freeze canonical bytes at import; the skeletons below inherit them
+SYSTEM_PROMPT = _canon(SYSTEM_PROMPT)
+QUESTION_TYPES = {question_type: _canon(body) for question_type, body in QUESTION_TYPES.items()}
+RESPONSE_FORMAT = _canon(RESPONSE_FORMAT)
+
+# Static prompt skeletons, assembled once at import: every call with the
+# same question type reuses a byte-identical prefix, which also maximizes
+# provider-side prompt-cache hits. "general" is a first-class entry, so
+# the default case resolves with the same single dict hit as the typed
+# ones; .get keeps unrecognized types on the general skeleton
+_GENERAL_SKELETON = SYSTEM_PROMPT + "\n\n" + RESPONSE_FORMAT + "\n\n"
+_PROMPT_SKELETONS = {
+    question_type: SYSTEM_PROMPT + "\n\n" + body + "\n\n" + RESPONSE_FORMAT + "\n\n"
+    for question_type, body in QUESTION_TYPES.items()
+}
+_PROMPT_SKELETONS["general"] = _GENERAL_SKELETON
+
+def get_chemE_messages(question, question_type="general", search_context="", history_context=""):
+    """
+    Generate the prompt as ordered layers, stable blocks first
+
+    The first layer is the precomputed skeleton (system prompt, question
+    type guidance and response format), byte-identical for every call
+    with the same question type so provider-side prefix caches hit.
+    Dynamic layers (recalled history, search context, the question)
+    follow in deterministic order. The layers can be passed straight to
+    Gemini as content parts, or joined into one string.
+
+    Args:
+        question (str): User's question
+        question_type (str): Type of question (calculation, theory, safety, design)
+        search_context (str): Additional context from web search
+        history_context (str): Relevant earlier turns from the conversation
+
+    Returns:
+        list: Prompt layers, stable to dynamic
+    """
+    layers = [_PROMPT_SKELETONS.get(question_type, _GENERAL_SKELETON)]
+
+    if history_context:
+        layers.append(f"**Relevant Earlier Conversation:**\n{history_context}\n\n")
+
+    if search_context:
+        layers.append(f"**Additional Context from Current Sources:**\n{search_context}\n\n")
+
+    layers.append(f"**Student Question:** {question}\n\n")
+    layers.append("**Your Response:**")
+
+    return layers
+
+def get_chemE_prompt(question, question_type="general", search_context="", history_context=""):
     """
     Generate a complete prompt for chemical engineering questions
-    
+
     Args:
         question (str): User's question
         question_type (str): Type of question (calculation, theory, safety, design)
         search_context (str): Additional context from web search
-    
+        history_context (str): Relevant earlier turns from the conversation
+
     Returns:
         str: Complete prompt for AI
     """
-    
-    prompt = SYSTEM_PROMPT + "\n\n"
-    
-    if question_type in QUESTION_TYPES:
-        prompt += QUESTION_TYPES[question_type] + "\n\n"
-    
-    prompt += RESPONSE_FORMAT + "\n\n"
-    
-    if search_context:
-        prompt += f"**Additional Context from Current Sources:**\n{search_context}\n\n"
-    
-    prompt += f"**Student Question:** {question}\n\n"
-    prompt += "**Your Response:**"
-    
-    return prompt
+    return "".join(get_chemE_messages(question, question_type, search_context, history_context))
 
-# Safety keywords for prioritizing safety-related content
-SAFETY_KEYWORDS = [
+# Safety keywords for prioritizing safety-related content; frozen so
+# membership tests are O(1) and the set is never mutated or rebuilt
+SAFETY_KEYWORDS = frozenset({
     "hazard", "safety", "toxic", "flammable", "explosive", "corrosive",
     "emergency", "accident", "risk", "danger", "protective", "ventilation",
     "exposure", "leak", "spill", "fire", "explosion", "chemical burn",
     "inhalation", "ingestion", "skin contact", "eye contact", "msds",
     "sds", "osha", "niosh", "hazop", "pha", "risk assessment"
-]
+})
 
 # Chemical engineering specific terms for context recognition
-CHEME_TERMS = [
+CHEME_TERMS = frozenset({
     "reactor", "distillation", "absorption", "extraction", "crystallization",
     "filtration", "separation", "heat exchanger", "pump", "compressor",
     "turbine", "boiler", "condenser", "evaporator", "mixer", "settler",
     "centrifuge", "dryer", "crusher", "mill", "pipeline", "valve",
     "control", "instrumentation", "pid", "feedback", "feedforward"
-]
\ No newline at end of file
+})
+
+# Prefer an Aho-Corasick automaton for keyword scanning when available
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+def _build_keyword_automaton(keywords):
+    """Build an Aho-Corasick automaton over the keywords, or None"""
+    if ahocorasick is None:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+_SAFETY_AC = _build_keyword_automaton(SAFETY_KEYWORDS)
+_CHEME_AC = _build_keyword_automaton(CHEME_TERMS)
+
+def safety_hits(text):
+    """
+    Find all safety keywords present in text
+
+    Args:
+        text (str): Text to scan
+
+    Returns:
+        list: Safety keywords found, in one linear pass when possible
+    """
+    text_lower = text.lower()
+
+    if _SAFETY_AC is not None:
+        return [keyword for _, keyword in _SAFETY_AC.iter(text_lower)]
+
+    return [keyword for keyword in SAFETY_KEYWORDS if keyword in text_lower]
+
+def cheme_hits(text):
+    """
+    Find all chemical engineering terms present in text
+
+    Args:
+        text (str): Text to scan
+
+    Returns:
+        list: ChemE terms found, in one linear pass when possible
+    """
+    text_lower = text.lower()
+
+    if _CHEME_AC is not None:
+        return [term for _, term in _CHEME_AC.iter(text_lower)]
+
+    return [term for term in CHEME_TERMS if term in text_lower]
\ No newline at end of file
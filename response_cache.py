@@ -0,0 +1,139 @@
+
+"""
+Exact-match response cache for the Chemical Engineering Bot
+Keyed on a canonical hash of question, question type and search context
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from .utils import clean_text
+
+class ResponseCache:
+    """
+    LRU + TTL cache for generated responses
+
+    Keys are built from the cleaned, lowercased question together with
+    the question type and a hash of the search context, so "What is
+    distillation?" and "what is  distillation?" share one entry while a
+    change in retrieved context forces a fresh generation. Entries older
+    than the TTL are re-evaluated rather than served stale.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        """
+        Initialize the response cache
+
+        Args:
+            maxsize (int): Maximum number of cached entries (LRU eviction)
+            ttl (float): Seconds before an entry is considered stale
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()  # key -> (response, timestamp)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def make_key(question: str, question_type: str = "general",
+                 search_context: str = "") -> str:
+        """
+        Build a canonical cache key
+
+        The question is canonicalized via clean_text() + lower-casing; the
+        search context contributes only its hash, so long contexts do not
+        inflate the key.
+        """
+        canonical = clean_text(question).lower()
+        context_digest = hashlib.blake2b(
+            search_context.encode('utf-8'), digest_size=16
+        ).hexdigest() if search_context else ""
+
+        return hashlib.blake2b(
+            f"{canonical}|{question_type}|{context_digest}".encode('utf-8'),
+            digest_size=16
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on miss or expiry"""
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self._misses += 1
+                return None
+
+            response, timestamp = entry
+            if time.time() - timestamp > self.ttl:
+                # Stale: drop it so the caller regenerates
+                del self._entries[key]
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return response
+
+    def put(self, key: str, response: str):
+        """Store a response, evicting the least recently used entry"""
+        with self._lock:
+            self._entries[key] = (response, time.time())
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_call(self, question: str, question_type: str,
+                    search_context: str, llm_fn: Callable[[], str],
+                    should_cache: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        Return the cached response for this request, calling llm_fn on a miss
+
+        Args:
+            question (str): User's question
+            question_type (str): Categorized question type
+            search_context (str): Web search context included in the prompt
+            llm_fn (Callable): Zero-argument callable that generates the
+                response; only invoked when no fresh entry exists
+            should_cache (Callable): Optional predicate over the generated
+                response; when it returns False the response is passed
+                through uncached (e.g. error fallbacks)
+
+        Returns:
+            str: Cached or freshly generated response
+        """
+        key = self.make_key(question, question_type, search_context)
+
+        response = self.get(key)
+        if response is not None:
+            return response
+
+        response = llm_fn()
+        if should_cache is None or should_cache(response):
+            self.put(key, response)
+        return response
+
+    def clear(self):
+        """Clear all cached entries"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss statistics"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / total if total else 0.0
+            }
+
+# Shared instance used by the bot engine
+response_cache = ResponseCache()
@@ -0,0 +1,218 @@
+
+"""
+Semantic response cache for the Chemical Engineering Bot
+Serves cached answers for structurally similar questions of the same type
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# Prefer a Numba-compiled similarity kernel for large embedding sets
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Below this many cached embeddings, the plain numpy matmul wins; above
+# it, the compiled kernel avoids the temporary similarity array. Kept
+# below the default per-shard maxsize (256) so warm shards actually
+# reach the kernel
+_KERNEL_MIN_VECTORS = 128
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+if numba is not None:
+    @numba.njit(fastmath=True, cache=True)
+    def _best_cosine(embeddings, scales, query, query_scale, threshold):
+        """Return (index, score) of the best row above threshold, else (-1, threshold)"""
+        best_index = -1
+        best_score = threshold
+        for i in range(embeddings.shape[0]):
+            acc = np.int32(0)
+            for j in range(embeddings.shape[1]):
+                acc += np.int32(embeddings[i, j]) * np.int32(query[j])
+            score = acc * scales[i] * query_scale
+            if score > best_score:
+                best_score = score
+                best_index = i
+        return best_index, best_score
+else:
+    _best_cosine = None
+
+class _Shard:
+    """Per-question-type slice of the cache with its own stacked arrays"""
+
+    def __init__(self):
+        self.entries: OrderedDict = OrderedDict()  # digest -> entry dict
+        self.matrix: Optional[np.ndarray] = None   # stacked int8 embeddings
+        self.scales: Optional[np.ndarray] = None   # per-row dequant scales
+        self.row_keys: Optional[list] = None       # row index -> entry key
+
+class SemanticCache:
+    """
+    Semantic cache for generated answers keyed on question embeddings
+
+    Entries are found either by exact hash of the normalized question or
+    by cosine similarity of its embedding against all cached embeddings,
+    so near-duplicate questions skip the Gemini round trip entirely.
+
+    The cache is partitioned by question type: a "safety" question can
+    only ever hit an entry cached for another safety question, never a
+    similarly worded calculation or theory entry.
+    """
+
+    def __init__(self, maxsize: int = 256, threshold: float = 0.92,
+                 ttl: float = 3600):
+        """
+        Initialize the semantic cache
+
+        Args:
+            maxsize (int): Maximum entries per question type (LRU eviction)
+            threshold (float): Minimum cosine similarity for a semantic hit
+            ttl (float): Seconds before an entry is considered stale
+        """
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.ttl = ttl
+        self._shards: Dict[str, _Shard] = {}
+        self._lock = threading.Lock()
+
+    def _evict(self, shard: _Shard, key: str):
+        """Drop one entry and the stacked arrays that referenced its row"""
+        del shard.entries[key]
+        shard.matrix = None
+        shard.scales = None
+        shard.row_keys = None
+
+    @staticmethod
+    def make_key(question: str) -> str:
+        """Build an exact-match cache key from a normalized question"""
+        normalized = _WHITESPACE_RE.sub(' ', question.lower()).strip()
+        return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _quantize(embedding: np.ndarray) -> Tuple[np.ndarray, float]:
+        """
+        Quantize an embedding to int8 with one symmetric per-vector scale
+
+        v ≈ q * scale, so dot(v1, v2) ≈ (q1 · q2) * scale1 * scale2. This
+        stores a quarter of the bytes of float32 and moves a quarter of
+        the bandwidth per lookup.
+        """
+        scale = float(np.abs(embedding).max()) / 127.0
+
+        if scale == 0.0:
+            return np.zeros(embedding.shape, dtype=np.int8), 0.0
+
+        return np.round(embedding / scale).astype(np.int8), scale
+
+    def get(self, key: str, embedding: Optional[np.ndarray] = None,
+            question_type: str = "general") -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached entry by exact key, then by embedding similarity
+
+        Only entries cached under the same question type are considered.
+
+        Args:
+            key (str): Exact-match key from make_key()
+            embedding (np.ndarray): Unit-normalized question embedding
+            question_type (str): Categorized question type
+
+        Returns:
+            Dict: Cached entry, or None on miss
+        """
+        with self._lock:
+            shard = self._shards.get(question_type)
+            if shard is None:
+                return None
+
+            # Exact-match fast path; stale entries miss and are dropped
+            entry = shard.entries.get(key)
+            if entry is not None:
+                if time.time() - entry['timestamp'] > self.ttl:
+                    self._evict(shard, key)
+                    return None
+                shard.entries.move_to_end(key)
+                return entry
+
+            if embedding is None or not shard.entries:
+                return None
+
+            # Single scan over the shard's quantized embeddings. The row
+            # order is snapshotted into row_keys: LRU move_to_end calls on
+            # hits reorder the dict, so rows must never be mapped back
+            # through the live key order
+            if shard.matrix is None:
+                shard.matrix = np.ascontiguousarray(
+                    np.stack([e['embedding_q'] for e in shard.entries.values()])
+                )
+                shard.scales = np.fromiter(
+                    (e['scale'] for e in shard.entries.values()),
+                    dtype=np.float32,
+                    count=len(shard.entries)
+                )
+                shard.row_keys = list(shard.entries.keys())
+
+            query_q, query_scale = self._quantize(embedding)
+
+            if _best_cosine is not None and len(shard.entries) >= _KERNEL_MIN_VECTORS:
+                # Compiled kernel: no temporary similarity array
+                best_index, _ = _best_cosine(
+                    shard.matrix, shard.scales, query_q,
+                    np.float32(query_scale), np.float32(self.threshold)
+                )
+                if best_index < 0:
+                    return None
+            else:
+                # int8 dot products accumulated in int32, dequantized per row
+                dots = np.einsum('ij,j->i', shard.matrix, query_q, dtype=np.int32)
+                similarities = dots.astype(np.float32) * shard.scales * query_scale
+                best_index = int(np.argmax(similarities))
+                if similarities[best_index] < self.threshold:
+                    return None
+
+            best_key = shard.row_keys[best_index]
+            entry = shard.entries[best_key]
+
+            if time.time() - entry['timestamp'] > self.ttl:
+                self._evict(shard, best_key)
+                return None
+
+            shard.entries.move_to_end(best_key)
+            return entry
+
+    def put(self, key: str, embedding: np.ndarray, entry: Dict[str, Any],
+            question_type: str = "general"):
+        """Store an answer entry, evicting the least recently used one"""
+        with self._lock:
+            shard = self._shards.setdefault(question_type, _Shard())
+
+            entry = dict(entry)
+            entry['embedding_q'], entry['scale'] = self._quantize(embedding)
+            entry['timestamp'] = time.time()
+
+            shard.entries[key] = entry
+            shard.entries.move_to_end(key)
+
+            while len(shard.entries) > self.maxsize:
+                shard.entries.popitem(last=False)
+
+            # Invalidate the stacked arrays; rebuilt lazily on next lookup
+            shard.matrix = None
+            shard.scales = None
+            shard.row_keys = None
+
+    def clear(self):
+        """Clear all cached entries"""
+        with self._lock:
+            self._shards.clear()
+
+# Shared instance used by the bot engine; answers are reusable across
+# sessions, unlike conversation history which stays per-session
+semantic_cache = SemanticCache()
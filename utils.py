@@ -3,11 +3,138 @@
 Utility functions for Chemical Engineering Bot
 """
 
+import io
 import re
 import string
+from collections import deque
+from urllib.parse import urlsplit
 from typing import List, Dict, Any
 import streamlit as st
 
+# Prefer an Aho-Corasick automaton for multi-keyword scans when available
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Prefer PCRE2's JIT (x86/ARM) for the formula scan when available; any
+# import or compile failure falls back to the stdlib engine
+try:
+    import pcre2
+except ImportError:
+    pcre2 = None
+
+# Precompiled patterns, built once at import
+_WS_RE = re.compile(r'\s+')
+# Keep: letters, numbers, spaces, parentheses, +, -, =, /, \, degrees,
+# subscripts and arrows (chemical formulas survive the cleanup)
+_NONCHEM_RE = re.compile(r'[^\w\s\(\)\+\-=\/\\°₀₁₂₃₄₅₆₇₈₉→←↔]')
+# Pattern for chemical formulas (e.g., H2SO4, CaCO3, etc.). The lookahead
+# demands a lowercase letter or digit somewhere, which structurally rejects
+# single capitals and all-caps words ("I", "CSTR") that a Python-level
+# filter previously had to weed out character by character
+_FORMULA_PATTERN = r'\b(?=[A-Za-z0-9]*[a-z0-9])[A-Z][a-z]?[0-9]*(?:[A-Z][a-z]?[0-9]*)*\b'
+_FORMULA_RE = re.compile(_FORMULA_PATTERN)
+
+_FORMULA_PCRE = None
+if pcre2 is not None:
+    try:
+        _FORMULA_PCRE = pcre2.compile(_FORMULA_PATTERN, jit=True)
+    except Exception:
+        _FORMULA_PCRE = None
+
+def _find_formulas(text):
+    """Find all formula candidates, JIT-compiled when PCRE2 is available"""
+    if _FORMULA_PCRE is not None:
+        return _FORMULA_PCRE.findall(text)
+
+    return _FORMULA_RE.findall(text)
+# One alternation covering fractions, subscripts and superscripts: a
+# single traversal replaces three sequential re.sub passes, and later
+# branches can no longer re-match text inserted by earlier ones
+_EQN_RE = re.compile(
+    r'(?P<fn>\w+)/(?P<fd>\w+)'          # fraction: a/b
+    r'|(?P<sb1>[A-Za-z])(?P<sb2>[0-9]+)'  # subscript: H2
+    r'|\^(?P<sp>[0-9]+)'                # superscript: ^2
+)
+
+def _format_equation_match(match):
+    """Emit the LaTeX form for whichever equation branch matched"""
+    if match.group('fn') is not None:
+        return f'$\\frac{{{match.group("fn")}}}{{{match.group("fd")}}}$'
+    if match.group('sb1') is not None:
+        return f'{match.group("sb1")}$_{{{match.group("sb2")}}}$'
+    return f'$^{{{match.group("sp")}}}$'
+
+# Question categories and their trigger keywords, in precedence order;
+# tuples, since they are read-only and iterated on every call
+_QUESTION_CATEGORIES = (
+    ('safety', ('safe', 'hazard', 'danger', 'toxic', 'risk', 'accident', 'emergency')),
+    ('calculation', ('calculate', 'compute', 'find', 'determine', 'solve', 'how much', 'what is the')),
+    ('design', ('design', 'size', 'select', 'choose', 'optimize', 'specify')),
+    ('theory', ('explain', 'what is', 'how does', 'why', 'difference', 'compare')),
+)
+
+# Words that mark obviously non-genuine input
+_INAPPROPRIATE_WORDS = ('spam', 'test123', 'asdf')
+
+def _build_inappropriate_automaton():
+    """Build one automaton over the inappropriate words, or None"""
+    if ahocorasick is None:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for word in _INAPPROPRIATE_WORDS:
+        automaton.add_word(word, word)
+    automaton.make_automaton()
+    return automaton
+
+_INAPPROPRIATE_AC = _build_inappropriate_automaton()
+
+# Common chemical formulas recognized even when the generic pattern
+# misses them
+_COMMON_CHEMICALS = (
+    'H2O', 'CO2', 'NH3', 'H2SO4', 'HCl', 'NaOH', 'CaCO3', 'NaCl',
+    'CH4', 'C2H6', 'C3H8', 'C2H4', 'C2H2', 'CO', 'NO', 'NO2', 'SO2'
+)
+
+def _build_chemical_automaton():
+    """Build one automaton over the common chemical formulas, or None"""
+    if ahocorasick is None:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for chemical in _COMMON_CHEMICALS:
+        automaton.add_word(chemical, chemical)
+    automaton.make_automaton()
+    return automaton
+
+_COMMON_CHEM_AC = _build_chemical_automaton()
+
+# Professional organization domains scored by get_source_priority_score
+_PROFESSIONAL_ORGS = ('aiche.org', 'acs.org', 'asme.org', 'api.org')
+
+def _build_category_automaton():
+    """Build one automaton mapping every trigger keyword to its category"""
+    if ahocorasick is None:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for category, words in _QUESTION_CATEGORIES:
+        for word in words:
+            automaton.add_word(word, category)
+    automaton.make_automaton()
+    return automaton
+
+_CATEGORY_AC = _build_category_automaton()
+
+# One alternation with a named group per category: a single C-level scan
+# reports every category whose trigger words appear in the question
+_CATEGORY_RE = re.compile('|'.join(
+    '(?P<{}>{})'.format(category, '|'.join(map(re.escape, words)))
+    for category, words in _QUESTION_CATEGORIES
+))
+
 def clean_text(text: str) -> str:
     """
     Clean and format text for better readability
@@ -21,17 +148,11 @@ def clean_text(text: str) -> str:
     if not text:
         return ""
     
-    # Remove extra whitespace
-    text = ' '.join(text.split())
-    
     # Remove special characters but keep chemical formulas
-    # Keep: letters, numbers, spaces, parentheses, +, -, =, /, \, degrees, subscripts
-    text = re.sub(r'[^\w\s\(\)\+\-=\/\\°₀₁₂₃₄₅₆₇₈₉→←↔]', ' ', text)
-    
-    # Fix multiple spaces
-    text = re.sub(r'\s+', ' ', text)
-    
-    return text.strip()
+    text = _NONCHEM_RE.sub(' ', text)
+
+    # Collapse all whitespace runs (spaces, tabs, newlines) in one pass
+    return _WS_RE.sub(' ', text).strip()
 
 def extract_chemical_formulas(text: str) -> List[str]:
     """
@@ -43,31 +164,19 @@ def extract_chemical_formulas(text: str) -> List[str]:
     Returns:
         List[str]: List of detected chemical formulas
     """
-    # Pattern for chemical formulas (e.g., H2SO4, CaCO3, etc.)
-    formula_pattern = r'\b[A-Z][a-z]?[0-9]*(?:[A-Z][a-z]?[0-9]*)*\b'
-    
-    # Common chemical formulas
-    common_chemicals = [
-        'H2O', 'CO2', 'NH3', 'H2SO4', 'HCl', 'NaOH', 'CaCO3', 'NaCl',
-        'CH4', 'C2H6', 'C3H8', 'C2H4', 'C2H2', 'CO', 'NO', 'NO2', 'SO2'
-    ]
-    
-    formulas = re.findall(formula_pattern, text)
-    
-    # Filter to likely chemical formulas
-    valid_formulas = []
-    for formula in formulas:
-        if (len(formula) >= 2 and 
-            any(c.isupper() for c in formula) and 
-            any(c.islower() or c.isdigit() for c in formula)):
-            valid_formulas.append(formula)
-    
-    # Add common chemicals if mentioned
-    for chemical in common_chemicals:
-        if chemical in text:
-            valid_formulas.append(chemical)
-    
-    return list(set(valid_formulas))
+    # The pattern only yields likely formulas, so matches go straight
+    # into the deduplicating set with no per-character filtering
+    valid_formulas = set(_find_formulas(text))
+
+    # Add common chemicals if mentioned, in one linear pass when possible
+    if _COMMON_CHEM_AC is not None:
+        valid_formulas.update(chemical for _, chemical in _COMMON_CHEM_AC.iter(text))
+    else:
+        valid_formulas.update(
+            chemical for chemical in _COMMON_CHEMICALS if chemical in text
+        )
+
+    return list(valid_formulas)
 
 def format_equations(text: str) -> str:
     """
@@ -79,52 +188,39 @@ def format_equations(text: str) -> str:
     Returns:
         str: Formatted text with improved equation display
     """
-    # Add LaTeX formatting for common mathematical expressions
-    # This is a simplified version - could be expanded
-    
-    # Format fractions
-    text = re.sub(r'(\w+)/(\w+)', r'$\\frac{\1}{\2}$', text)
-    
-    # Format subscripts (chemical formulas)
-    text = re.sub(r'([A-Za-z])([0-9]+)', r'\1$_{\2}$', text)
-    
-    # Format superscripts (powers)
-    text = re.sub(r'\^([0-9]+)', r'$^{\1}$', text)
-    
-    return text
+    # Add LaTeX formatting for common mathematical expressions in one
+    # pass; the callback dispatches on which alternation branch matched
+    return _EQN_RE.sub(_format_equation_match, text)
 
-def categorize_question(question: str) -> str:
+def categorize_question(question: str, question_lower: str = None) -> str:
     """
     Categorize the type of chemical engineering question
-    
+
     Args:
         question (str): User's question
-        
+        question_lower (str): Pre-lowercased question, to avoid re-lowering
+            when the caller already has it
+
     Returns:
         str: Question category
     """
-    question_lower = question.lower()
-    
-    # Safety-related keywords
-    safety_words = ['safe', 'hazard', 'danger', 'toxic', 'risk', 'accident', 'emergency']
-    if any(word in question_lower for word in safety_words):
-        return "safety"
-    
-    # Calculation keywords
-    calc_words = ['calculate', 'compute', 'find', 'determine', 'solve', 'how much', 'what is the']
-    if any(word in question_lower for word in calc_words):
-        return "calculation"
-    
-    # Design keywords
-    design_words = ['design', 'size', 'select', 'choose', 'optimize', 'specify']
-    if any(word in question_lower for word in design_words):
-        return "design"
-    
-    # Theory keywords
-    theory_words = ['explain', 'what is', 'how does', 'why', 'difference', 'compare']
-    if any(word in question_lower for word in theory_words):
-        return "theory"
-    
+    if question_lower is None:
+        question_lower = question.lower()
+
+    # Single automaton pass over the question, then resolve by precedence
+    if _CATEGORY_AC is not None:
+        matched = {category for _, category in _CATEGORY_AC.iter(question_lower)}
+        for category, _ in _QUESTION_CATEGORIES:
+            if category in matched:
+                return category
+        return "general"
+
+    # Fallback: one alternation scan, then resolve by precedence
+    matched = {m.lastgroup for m in _CATEGORY_RE.finditer(question_lower)}
+    for category, _ in _QUESTION_CATEGORIES:
+        if category in matched:
+            return category
+
     return "general"
 
 def validate_input(question: str) -> tuple[bool, str]:
@@ -137,20 +233,32 @@ def validate_input(question: str) -> tuple[bool, str]:
     Returns:
         tuple: (is_valid, error_message)
     """
-    if not question or not question.strip():
+    # Cheapest checks first: length needs no allocation, and the question
+    # is stripped and case-folded once each
+    if not question:
         return False, "Please enter a question."
-    
-    if len(question.strip()) < 3:
-        return False, "Please enter a more detailed question."
-    
+
     if len(question) > 1000:
         return False, "Question is too long. Please keep it under 1000 characters."
-    
+
+    stripped = question.strip()
+    if not stripped:
+        return False, "Please enter a question."
+
+    if len(stripped) < 3:
+        return False, "Please enter a more detailed question."
+
     # Check for inappropriate content (basic check)
-    inappropriate_words = ['spam', 'test123', 'asdf']
-    if any(word in question.lower() for word in inappropriate_words):
+    question_folded = question.casefold()
+
+    if _INAPPROPRIATE_AC is not None:
+        inappropriate = next(_INAPPROPRIATE_AC.iter(question_folded), None) is not None
+    else:
+        inappropriate = any(word in question_folded for word in _INAPPROPRIATE_WORDS)
+
+    if inappropriate:
         return False, "Please enter a genuine chemical engineering question."
-    
+
     return True, ""
 
 def format_response_for_display(response: str) -> str:
@@ -165,35 +273,31 @@ def format_response_for_display(response: str) -> str:
     """
     if not response:
         return "No response generated."
-    
-    # Split into sections
-    sections = response.split('\n\n')
-    formatted_sections = []
-    
-    for section in sections:
+
+    # Stream everything into one buffer: no per-section or per-line
+    # intermediate lists, no nested joins
+    buffer = io.StringIO()
+    first_section = True
+
+    for section in response.split('\n\n'):
         section = section.strip()
         if not section:
             continue
-            
+
+        if not first_section:
+            buffer.write('\n\n')
+        first_section = False
+
         # Format headers (lines starting with **)
         if section.startswith('**') and section.endswith('**'):
             section = f"\n### {section[2:-2]}\n"
-        
-        # Format bullet points
-        lines = section.split('\n')
-        formatted_lines = []
-        for line in lines:
-            line = line.strip()
-            if line.startswith('- '):
-                formatted_lines.append(line)
-            elif line.startswith('• '):
-                formatted_lines.append(line)
-            else:
-                formatted_lines.append(line)
-        
-        formatted_sections.append('\n'.join(formatted_lines))
-    
-    return '\n\n'.join(formatted_sections)
+
+        for index, line in enumerate(section.split('\n')):
+            if index:
+                buffer.write('\n')
+            buffer.write(line.strip())
+
+    return buffer.getvalue()
 
 def get_source_priority_score(url: str) -> int:
     """
@@ -205,25 +309,29 @@ def get_source_priority_score(url: str) -> int:
     Returns:
         int: Priority score (higher = better)
     """
-    url_lower = url.lower()
-    
+    # Score the hostname only, so a match in the path or query string
+    # (e.g. example.com/?u=.edu) can no longer inflate the score; URLs
+    # without a scheme fall back to their leading host component
+    host = urlsplit(url).hostname or url.split('/', 1)[0]
+    host = host.lower()
+
     # Educational institutions (.edu)
-    if '.edu' in url_lower:
+    if host.endswith('.edu'):
         return 10
-    
+
     # Government sites (.gov)
-    if '.gov' in url_lower:
+    if host.endswith('.gov'):
         return 9
-    
+
     # Professional organizations
-    professional_orgs = ['aiche.org', 'acs.org', 'asme.org', 'api.org']
-    if any(org in url_lower for org in professional_orgs):
-        return 8
-    
+    for org in _PROFESSIONAL_ORGS:
+        if host == org or host.endswith('.' + org):
+            return 8
+
     # Wikipedia and similar
-    if 'wikipedia' in url_lower:
+    if host == 'wikipedia.org' or host.endswith('.wikipedia.org'):
         return 6
-    
+
     # General websites
     return 5
 
@@ -238,19 +346,22 @@ def log_interaction(question: str, response: str, sources: List[str] = None):
     """
     # In a production environment, you might want to log to a file or database
     # For now, we'll just use Streamlit's session state
-    
-    if 'interaction_log' not in st.session_state:
-        st.session_state.interaction_log = []
-    
-    log_entry = {
+
+    session_state = st.session_state
+
+    if not session_state.get('log_enabled', True):
+        return
+
+    log = session_state.get('interaction_log')
+    if log is None:
+        # Bounded ring buffer: appends are O(1) and old entries fall off
+        # the left, so no slice rebuild is ever needed
+        log = deque(maxlen=50)
+        session_state.interaction_log = log
+
+    log.append({
         'question': question[:100],  # Limit length
         'response_length': len(response),
         'sources_count': len(sources) if sources else 0,
-        'timestamp': str(st.session_state.get('current_time', 'unknown'))
-    }
-    
-    st.session_state.interaction_log.append(log_entry)
-    
-    # Keep only last 50 interactions
-    if len(st.session_state.interaction_log) > 50:
-        st.session_state.interaction_log = st.session_state.interaction_log[-50:]
\ No newline at end of file
+        'timestamp': str(session_state.get('current_time', 'unknown'))
+    })
\ No newline at end of file